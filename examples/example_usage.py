@@ -2,6 +2,7 @@
 
 import asyncio
 
+from gemini_mcp.__main__ import run_async
 from gemini_mcp.tools import GeminiTools
 
 
@@ -9,31 +10,44 @@ async def main():
     """Demonstrate usage of Gemini MCP tools."""
     tools = GeminiTools()
 
-    # Example 1: Simple prompt
-    print("Example 1: Simple prompt")
-    result = await tools.call_tool(
-        "gemini_prompt", {"prompt": "What are the benefits of using MCP for AI integrations?"}
+    # The examples are independent, so run them concurrently
+    prompt_result, research_result, summary_result = await asyncio.gather(
+        # Example 1: Simple prompt
+        tools.call_tool(
+            "gemini_prompt", {"prompt": "What are the benefits of using MCP for AI integrations?"}
+        ),
+        # Example 2: Research a topic
+        tools.call_tool(
+            "gemini_research", {"topic": "Model Context Protocol (MCP) architecture and use cases"}
+        ),
+        # Example 3: Summarize content
+        tools.call_tool(
+            "gemini_summarize",
+            {
+                "content": "The Model Context Protocol (MCP) is an open protocol that standardizes how applications provide context to LLMs. It enables seamless integration between AI assistants and external tools, allowing them to access files, run commands, and interact with various services. MCP servers expose tools and resources that AI assistants can use to help users with tasks.",
+                "summary_type": "bullet_points",
+            },
+        ),
     )
-    print(f"Response: {result}\n")
 
-    # Example 2: Research a topic
+    print("Example 1: Simple prompt")
+    print(f"Response: {prompt_result}\n")
+
     print("Example 2: Research a topic")
-    result = await tools.call_tool(
-        "gemini_research", {"topic": "Model Context Protocol (MCP) architecture and use cases"}
-    )
-    print(f"Research results: {result[:200]}...\n")
+    print(f"Research results: {research_result[:200]}...\n")
 
-    # Example 3: Summarize content
     print("Example 3: Summarize content")
+    print(f"Summary: {summary_result}\n")
+
+    # Example 4: Batch several small prompts into one Gemini call
+    print("Example 4: Batch prompts")
     result = await tools.call_tool(
-        "gemini_summarize",
-        {
-            "content": "The Model Context Protocol (MCP) is an open protocol that standardizes how applications provide context to LLMs. It enables seamless integration between AI assistants and external tools, allowing them to access files, run commands, and interact with various services. MCP servers expose tools and resources that AI assistants can use to help users with tasks.",
-            "summary_type": "bullet_points",
-        },
+        "gemini_batch",
+        {"prompts": ["What is MCP?", "Name one MCP client.", "Name one MCP server."]},
     )
-    print(f"Summary: {result}\n")
+    print(f"Batch responses: {result}\n")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Use the same event loop as the server for comparable timings
+    run_async(main())
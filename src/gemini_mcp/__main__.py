@@ -3,12 +3,17 @@
 import asyncio
 import logging
 import sys
+from collections.abc import Coroutine
+from typing import Any, TypeVar
 
 import click
 from rich.console import Console
 from rich.logging import RichHandler
 
 from .server import GeminiMCPServer
+from .tools import _AUTH_ERR_RE, _find_gemini
+
+T = TypeVar("T")
 
 console = Console()
 
@@ -20,13 +25,27 @@ def setup_logging(debug: bool = False) -> None:
     # When running as MCP server, redirect all logs to stderr
     stderr_console = Console(stderr=True)
 
+    # Rich tracebacks read source files for every logged exception; only pay for
+    # that when debugging
     logging.basicConfig(
         level=level,
         format="%(message)s",
-        handlers=[RichHandler(console=stderr_console, rich_tracebacks=True)],
+        handlers=[RichHandler(console=stderr_console, rich_tracebacks=debug)],
     )
 
 
+def run_async(main: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine on uvloop's event loop when the optional dependency is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        # uvloop is optional and unavailable on Windows; keep the default loop
+        return asyncio.run(main)
+
+    result: T = uvloop.run(main)
+    return result
+
+
 @click.group(invoke_without_command=True)
 @click.option("--debug", is_flag=True, help="Enable debug logging")
 @click.pass_context
@@ -49,7 +68,7 @@ def serve(debug: bool) -> None:
         server = GeminiMCPServer()
 
         stderr_console.print("[green]Starting Gemini MCP Server...[/green]")
-        asyncio.run(server.run())
+        run_async(server.run())
 
     except RuntimeError as e:
         if "Gemini CLI not found" in str(e):
@@ -69,16 +88,47 @@ def serve(debug: bool) -> None:
         sys.exit(1)
 
 
+async def _run_gemini(*args: str, timeout: float) -> tuple[int | None, str, str]:
+    """Run the Gemini CLI without blocking the event loop.
+
+    Args:
+        *args: Arguments to pass to ``gemini``
+        timeout: Seconds to wait before killing the process
+
+    Returns:
+        Tuple of (returncode, stdout, stderr)
+
+    Raises:
+        asyncio.TimeoutError: If the command does not finish within ``timeout``
+    """
+    process = await asyncio.create_subprocess_exec(
+        "gemini",
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+
+    return process.returncode, stdout.decode(), stderr.decode()
+
+
 @cli.command("test")
 def test_gemini() -> None:
     """Test Gemini CLI installation and basic functionality."""
-    import shutil
-    import subprocess
+    asyncio.run(_test_gemini_async())
+
 
+async def _test_gemini_async() -> None:
+    """Run the `test` command checks."""
     console.print("[bold]Gemini CLI Test[/bold]\n")
 
     # Check if Gemini is installed
-    gemini_path = shutil.which("gemini")
+    gemini_path = _find_gemini()
     if not gemini_path:
         console.print("[red]✗ Gemini CLI not found in PATH[/red]")
         console.print("\nPlease install Gemini CLI first.")
@@ -89,29 +139,23 @@ def test_gemini() -> None:
     # Test basic functionality
     console.print("\n[yellow]Testing basic functionality...[/yellow]")
     try:
-        result = subprocess.run(
-            ["gemini", "-p", "Say 'Hello from Gemini MCP!'"],
-            capture_output=True,
-            text=True,
-            timeout=10,
+        returncode, stdout, stderr = await _run_gemini(
+            "-p", "Say 'Hello from Gemini MCP!'", timeout=10
         )
 
-        if result.returncode == 0:
+        if returncode == 0:
             console.print("[green]✓ Gemini CLI is working![/green]")
-            console.print(f"\nResponse: {result.stdout.strip()}")
+            console.print(f"\nResponse: {stdout.strip()}")
         else:
             console.print("[red]✗ Gemini CLI test failed[/red]")
-            error_msg = result.stderr.strip()
+            error_msg = stderr.strip()
             console.print(f"Error: {error_msg}")
 
             # Check for common authentication errors
-            if any(
-                phrase in error_msg.lower()
-                for phrase in ["not authenticated", "login required", "auth", "credentials"]
-            ):
+            if _AUTH_ERR_RE.search(error_msg):
                 console.print("\n[yellow]It looks like you're not authenticated.[/yellow]")
                 console.print("Please run: [cyan]gemini auth login[/cyan]")
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         console.print("[red]✗ Gemini CLI test timed out[/red]")
     except Exception as e:
         console.print(f"[red]✗ Test failed:[/red] {e}")
@@ -137,9 +181,12 @@ def list_tools() -> None:
 @cli.command("setup")
 def setup_check() -> None:
     """Check Gemini CLI setup and provide guidance."""
+    asyncio.run(_setup_check_async())
+
+
+async def _setup_check_async() -> None:
+    """Run the `setup` command checks."""
     import os
-    import shutil
-    import subprocess
 
     console.print("[bold]Gemini MCP Setup Check[/bold]\n")
 
@@ -147,7 +194,7 @@ def setup_check() -> None:
 
     # 1. Check if Gemini CLI is installed
     console.print("[yellow]1. Checking Gemini CLI installation...[/yellow]")
-    gemini_path = shutil.which("gemini")
+    gemini_path = _find_gemini()
     if not gemini_path:
         console.print("[red]✗ Gemini CLI not found[/red]")
         console.print("   Please install Gemini CLI and ensure it's in your PATH")
@@ -156,29 +203,39 @@ def setup_check() -> None:
     else:
         console.print(f"[green]✓ Found at: {gemini_path}[/green]\n")
 
+        # The version and authentication checks are independent, so run them
+        # concurrently and report the results in order once both finish
+        version_result, auth_result = await asyncio.gather(
+            _run_gemini("--version", timeout=5),
+            _run_gemini("-p", "Hello", timeout=10),
+            return_exceptions=True,
+        )
+
         # 2. Check Gemini CLI version
         console.print("[yellow]2. Checking Gemini CLI version...[/yellow]")
-        try:
-            result = subprocess.run(
-                ["gemini", "--version"], capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0:
-                console.print(f"[green]✓ Version: {result.stdout.strip()}[/green]\n")
+        if isinstance(version_result, BaseException):
+            console.print("[red]✗ Version check failed[/red]\n")
+        else:
+            returncode, stdout, _ = version_result
+            if returncode == 0:
+                console.print(f"[green]✓ Version: {stdout.strip()}[/green]\n")
             else:
                 console.print("[red]✗ Could not get version[/red]\n")
-        except Exception:
-            console.print("[red]✗ Version check failed[/red]\n")
 
         # 3. Check authentication
         console.print("[yellow]3. Checking authentication...[/yellow]")
-        try:
-            result = subprocess.run(
-                ["gemini", "-p", "Hello"], capture_output=True, text=True, timeout=10
-            )
-            if result.returncode == 0:
+        if isinstance(auth_result, asyncio.TimeoutError):
+            console.print("[red]✗ Authentication check timed out[/red]\n")
+            all_good = False
+        elif isinstance(auth_result, BaseException):
+            console.print(f"[red]✗ Check failed: {auth_result}[/red]\n")
+            all_good = False
+        else:
+            returncode, _, stderr = auth_result
+            if returncode == 0:
                 console.print("[green]✓ Authentication working[/green]\n")
             else:
-                error_msg = result.stderr.strip()
+                error_msg = stderr.strip()
                 if any(
                     phrase in error_msg.lower()
                     for phrase in ["not authenticated", "login required", "auth"]
@@ -189,12 +246,6 @@ def setup_check() -> None:
                 else:
                     console.print(f"[red]✗ Error: {error_msg}[/red]\n")
                     all_good = False
-        except subprocess.TimeoutExpired:
-            console.print("[red]✗ Authentication check timed out[/red]\n")
-            all_good = False
-        except Exception as e:
-            console.print(f"[red]✗ Check failed: {e}[/red]\n")
-            all_good = False
 
     # 4. Check environment
     console.print("[yellow]4. Checking environment...[/yellow]")
@@ -1,7 +1,9 @@
 """MCP server implementation for Gemini CLI integration."""
 
+import functools
 import logging
 import os
+from collections.abc import Mapping
 from importlib import metadata
 from logging import CRITICAL as LOG_CRITICAL
 from logging import DEBUG as LOG_DEBUG
@@ -9,6 +11,7 @@ from logging import ERROR as LOG_ERROR
 from logging import INFO as LOG_INFO
 from logging import WARNING as LOG_WARNING
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
 from mcp.server import Server
@@ -23,15 +26,44 @@ from mcp.types import (
     Tool,
 )
 
-from .tools import GeminiTools
+from .tools import GeminiTools, OutputCallback
 
 logger = logging.getLogger(__name__)
 
-# Get version from package metadata
-try:
-    __version__ = metadata.version("gemini-mcp")
-except Exception:
-    __version__ = "0.1.0"  # Fallback version
+# MCP logging levels mapped to Python logging levels
+_LEVEL_MAP: Mapping[str, int] = MappingProxyType(
+    {
+        "debug": LOG_DEBUG,
+        "info": LOG_INFO,
+        "notice": LOG_INFO,  # Python logging doesn't have NOTICE, map to INFO
+        "warning": LOG_WARNING,
+        "error": LOG_ERROR,
+        "critical": LOG_CRITICAL,
+        "alert": LOG_CRITICAL,  # Python logging doesn't have ALERT, map to CRITICAL
+        "emergency": LOG_CRITICAL,  # Python logging doesn't have EMERGENCY, map to CRITICAL
+    }
+)
+
+
+@functools.cache
+def _get_version() -> str:
+    """Get the package version from metadata, scanning sys.path only once."""
+    try:
+        return metadata.version("gemini-mcp")
+    except metadata.PackageNotFoundError:
+        return "0.1.0"  # Fallback version when the package isn't installed
+
+
+__version__ = _get_version()
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_allowed_dirs(env_value: str) -> tuple[str, ...]:
+    """Split a GEMINI_MCP_ALLOWED_DIRS value, parsing each distinct value only once.
+
+    Uses os.pathsep as the platform-specific path separator.
+    """
+    return tuple(d.strip() for d in env_value.split(os.pathsep) if d.strip())
 
 
 class GeminiMCPServer:
@@ -47,13 +79,9 @@ class GeminiMCPServer:
         # Initialize allowed directories from environment or parameter
         if allowed_directories is None:
             # Check for environment variable
-            env_dirs = os.environ.get("GEMINI_MCP_ALLOWED_DIRS")
-            if env_dirs:
-                # Use os.pathsep for platform-specific path separator
-                allowed_directories = [d.strip() for d in env_dirs.split(os.pathsep) if d.strip()]
-            else:
-                # Default to current working directory
-                allowed_directories = [str(Path.cwd())]
+            env_dirs = _parse_allowed_dirs(os.environ.get("GEMINI_MCP_ALLOWED_DIRS", ""))
+            # Default to current working directory
+            allowed_directories = list(env_dirs) if env_dirs else [str(Path.cwd())]
 
         self.tools = GeminiTools(allowed_directories=allowed_directories)
         self.server: Server = Server("gemini-mcp")
@@ -61,6 +89,16 @@ class GeminiMCPServer:
         # Register handlers
         self._register_handlers()
 
+        # Capabilities depend only on the registered handlers, so build them once
+        self._init_options = InitializationOptions(
+            server_name="gemini-mcp",
+            server_version=__version__,
+            capabilities=self.server.get_capabilities(
+                notification_options=NotificationOptions(),
+                experimental_capabilities={},
+            ),
+        )
+
     def _register_handlers(self) -> None:
         """Register all MCP handlers."""
 
@@ -77,7 +115,9 @@ class GeminiMCPServer:
             logger.debug(f"Calling tool: {name} with arguments: {arguments}")
 
             try:
-                result = await self.tools.call_tool(name, arguments or {})
+                result = await self.tools.call_tool(
+                    name, arguments or {}, on_output=self._progress_callback()
+                )
                 return [TextContent(type="text", text=result)]
             except Exception as e:
                 logger.error(f"Error calling tool {name}: {e}", exc_info=True)
@@ -87,38 +127,51 @@ class GeminiMCPServer:
         async def set_logging_level(level: LoggingLevel) -> None:
             """Set the logging level."""
             logger.info(f"Setting logging level to: {level}")
-            level_map: dict[str, int] = {
-                "debug": LOG_DEBUG,
-                "info": LOG_INFO,
-                "notice": LOG_INFO,  # Python logging doesn't have NOTICE, map to INFO
-                "warning": LOG_WARNING,
-                "error": LOG_ERROR,
-                "critical": LOG_CRITICAL,
-                "alert": LOG_CRITICAL,  # Python logging doesn't have ALERT, map to CRITICAL
-                "emergency": LOG_CRITICAL,  # Python logging doesn't have EMERGENCY, map to CRITICAL
-            }
-            logging.getLogger().setLevel(level_map.get(level, LOG_INFO))
+            logging.getLogger().setLevel(_LEVEL_MAP.get(level, LOG_INFO))
+
+    def _progress_callback(self) -> OutputCallback | None:
+        """Build a callback streaming Gemini output as MCP progress notifications.
+
+        MCP tool results can't be sent in pieces, so output is forwarded through
+        the progress notification ``message`` field while the tool runs. This
+        only happens when the client asked for progress by sending a token.
+
+        Returns:
+            The callback, or None if the current request has no progress token
+        """
+        try:
+            ctx = self.server.request_context
+        except LookupError:
+            return None
+
+        progress_token = ctx.meta.progressToken if ctx.meta else None
+        if progress_token is None:
+            return None
+
+        chunks_sent = 0
+
+        async def send_progress(chunk: str) -> None:
+            nonlocal chunks_sent
+            chunks_sent += 1
+            await ctx.session.send_progress_notification(
+                progress_token, chunks_sent, message=chunk, related_request_id=str(ctx.request_id)
+            )
+
+        return send_progress
 
     async def run(self) -> None:
         """Run the MCP server."""
         logger.info("Starting Gemini MCP Server")
-        logger.info(f"Version: {__version__}")
-        logger.info(f"Gemini CLI: {self.tools.gemini_path}")
-        logger.info(f"Allowed directories: {[str(d) for d in self.tools.allowed_directories]}")
+        logger.info("Version: %s", __version__)
+        logger.info("Gemini CLI: %s", self.tools.gemini_path)
+        # Only stringify the directory list if the message will actually be emitted
+        if logger.isEnabledFor(LOG_INFO):
+            logger.info("Allowed directories: %s", [str(d) for d in self.tools.allowed_directories])
 
         # Run the stdio server
         async with stdio_server() as (read_stream, write_stream):
-            init_options = InitializationOptions(
-                server_name="gemini-mcp",
-                server_version=__version__,
-                capabilities=self.server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
-            )
-
             await self.server.run(
                 read_stream,
                 write_stream,
-                init_options,
+                self._init_options,
             )
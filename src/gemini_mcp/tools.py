@@ -1,14 +1,22 @@
 """Tool definitions for Gemini CLI integration."""
 
 import asyncio
+import codecs
+import contextlib
+import functools
+import hashlib
 import logging
+import math
 import os
+import re
 import shutil
-import tempfile
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
-import aiofiles
 from mcp.types import Tool
 
 logger = logging.getLogger(__name__)
@@ -17,6 +25,296 @@ logger = logging.getLogger(__name__)
 # Default model constant to avoid repetition
 DEFAULT_GEMINI_MODEL = "gemini-2.5-pro"
 
+# Maximum number of responses kept by the response cache
+RESPONSE_CACHE_SIZE = 128
+
+# Default cap on Gemini CLI subprocesses running at once
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Bytes read from the Gemini CLI's stdout per wakeup when streaming output
+STREAM_CHUNK_SIZE = 65536
+
+# Callback receiving Gemini output incrementally as it is produced
+OutputCallback = Callable[[str], Awaitable[None]]
+
+# Turns a tool's arguments into the Gemini prompt and the files to attach
+PromptTemplate = Callable[[dict[str, Any]], tuple[str, list[str]]]
+
+# Implementation of a single tool, taking its arguments and an optional output callback
+ToolHandler = Callable[[dict[str, Any], OutputCallback | None], Awaitable[str]]
+
+# Separator between prompts and responses in a gemini_batch call
+BATCH_SEPARATOR = "---BATCH-SEP---"
+
+# Instructions for gemini_research; the topic is appended after them
+_RESEARCH_PROMPT = """Please research the following topic and provide a comprehensive analysis.
+
+Please include:
+1. Overview and background
+2. Key findings and insights
+3. Relevant details and examples
+4. Conclusions and recommendations
+
+Be thorough but concise."""
+
+# Instructions for each gemini_analyze_code analysis_type
+_ANALYSIS_PROMPTS: Mapping[str, str] = MappingProxyType(
+    {
+        "review": "Please review this code and identify potential issues, bugs, or areas for improvement.",
+        "explain": "Please explain what this code does in detail, including its purpose and how it works.",
+        "optimize": "Please suggest optimizations for this code to improve performance, readability, or maintainability.",
+        "security": "Please analyze this code for security vulnerabilities and suggest fixes.",
+        "test": "Please suggest test cases and testing strategies for this code.",
+    }
+)
+
+# Instructions for each gemini_summarize summary_type
+_SUMMARY_PROMPTS: Mapping[str, str] = MappingProxyType(
+    {
+        "brief": "Please provide a brief summary of the following content in 2-3 sentences.",
+        "detailed": "Please provide a detailed summary of the following content, covering all main points.",
+        "bullet_points": "Please summarize the following content as bullet points.",
+        "executive": "Please provide an executive summary of the following content suitable for decision makers.",
+    }
+)
+
+# Authentication failures reported by the Gemini CLI on stderr
+_AUTH_ERR_RE = re.compile(r"not authenticated|login required|auth|credentials", re.IGNORECASE)
+
+# Tool schemas are static, so build them once at import rather than per request
+_TOOL_DEFS: tuple[Tool, ...] = (
+    Tool(
+        name="gemini_prompt",
+        description="Send a prompt to Gemini CLI and get a response",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "prompt": {
+                    "type": "string",
+                    "description": "The prompt to send to Gemini",
+                },
+                "model": {
+                    "type": "string",
+                    "description": f"The model to use (default: {DEFAULT_GEMINI_MODEL})",
+                    "default": DEFAULT_GEMINI_MODEL,
+                },
+                "context": {
+                    "type": "string",
+                    "description": "Additional context to prepend to the prompt",
+                },
+            },
+            "required": ["prompt"],
+        },
+    ),
+    Tool(
+        name="gemini_research",
+        description="Use Gemini to research a topic with optional file context",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "topic": {
+                    "type": "string",
+                    "description": "The research topic or question",
+                },
+                "files": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "List of file paths to include as context",
+                },
+                "model": {
+                    "type": "string",
+                    "description": f"The model to use (default: {DEFAULT_GEMINI_MODEL})",
+                    "default": DEFAULT_GEMINI_MODEL,
+                },
+            },
+            "required": ["topic"],
+        },
+    ),
+    Tool(
+        name="gemini_analyze_code",
+        description="Use Gemini to analyze code files",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "files": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "List of code files to analyze",
+                },
+                "analysis_type": {
+                    "type": "string",
+                    "description": "Type of analysis to perform",
+                    "enum": ["review", "explain", "optimize", "security", "test"],
+                },
+                "specific_question": {
+                    "type": "string",
+                    "description": "Specific question about the code",
+                },
+                "model": {
+                    "type": "string",
+                    "description": f"The model to use (default: {DEFAULT_GEMINI_MODEL})",
+                    "default": DEFAULT_GEMINI_MODEL,
+                },
+            },
+            "required": ["files", "analysis_type"],
+        },
+    ),
+    Tool(
+        name="gemini_summarize",
+        description="Use Gemini to summarize content from files or text",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "content": {
+                    "type": "string",
+                    "description": "Text content to summarize",
+                },
+                "files": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Files to summarize (alternative to content)",
+                },
+                "summary_type": {
+                    "type": "string",
+                    "description": "Type of summary",
+                    "enum": ["brief", "detailed", "bullet_points", "executive"],
+                    "default": "brief",
+                },
+                "model": {
+                    "type": "string",
+                    "description": f"The model to use (default: {DEFAULT_GEMINI_MODEL})",
+                    "default": DEFAULT_GEMINI_MODEL,
+                },
+            },
+            "required": [],
+        },
+    ),
+    Tool(
+        name="gemini_batch",
+        description="Send several independent prompts to Gemini in a single CLI call",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "prompts": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The prompts to send to Gemini",
+                },
+                "model": {
+                    "type": "string",
+                    "description": f"The model to use (default: {DEFAULT_GEMINI_MODEL})",
+                    "default": DEFAULT_GEMINI_MODEL,
+                },
+            },
+            "required": ["prompts"],
+        },
+    ),
+)
+
+
+def _prompt_template(arguments: dict[str, Any]) -> tuple[str, list[str]]:
+    """Build the gemini_prompt prompt, prepending any extra context."""
+    prompt = arguments["prompt"]
+    context = arguments.get("context", "")
+
+    return (f"{context}\n\n{prompt}" if context else prompt), []
+
+
+def _research_template(arguments: dict[str, Any]) -> tuple[str, list[str]]:
+    """Build the gemini_research prompt."""
+    # Keep the fixed instructions ahead of the topic so every research
+    # prompt shares the same prefix, which Gemini can reuse from its cache
+    return f"{_RESEARCH_PROMPT}\n\nTopic: {arguments['topic']}", arguments.get("files", [])
+
+
+def _analyze_code_template(arguments: dict[str, Any]) -> tuple[str, list[str]]:
+    """Build the gemini_analyze_code prompt for the requested analysis type."""
+    base_prompt = _ANALYSIS_PROMPTS.get(arguments["analysis_type"], "Please analyze this code.")
+    specific_question = arguments.get("specific_question", "")
+
+    if specific_question:
+        return f"{base_prompt}\n\nSpecific question: {specific_question}", arguments["files"]
+    return base_prompt, arguments["files"]
+
+
+def _summarize_template(arguments: dict[str, Any]) -> tuple[str, list[str]]:
+    """Build the gemini_summarize prompt; inline content takes precedence over files."""
+    content = arguments.get("content", "")
+    prompt = _SUMMARY_PROMPTS.get(arguments.get("summary_type", "brief"), _SUMMARY_PROMPTS["brief"])
+
+    if content:
+        return f"{prompt}\n\nContent:\n{content}", []
+    return prompt, arguments.get("files", [])
+
+
+def _parse_max_concurrency(env_value: str | None) -> int:
+    """Parse GEMINI_MCP_MAX_CONCURRENCY, falling back to the default for invalid values."""
+    if env_value is None:
+        return DEFAULT_MAX_CONCURRENCY
+    try:
+        max_concurrency = int(env_value)
+    except ValueError:
+        max_concurrency = 0
+    if max_concurrency < 1:
+        # Semaphore(0) would make every tool call wait forever
+        logger.warning(
+            f"Ignoring invalid GEMINI_MCP_MAX_CONCURRENCY={env_value!r}; "
+            f"expected a positive integer, so using {DEFAULT_MAX_CONCURRENCY}"
+        )
+        return DEFAULT_MAX_CONCURRENCY
+    return max_concurrency
+
+
+def _parse_cache_ttl(env_value: str | None) -> float:
+    """Parse GEMINI_MCP_CACHE_TTL, disabling the cache for invalid values."""
+    if env_value is None:
+        return 0.0
+    try:
+        ttl = float(env_value)
+    except ValueError:
+        ttl = math.nan
+    if not math.isfinite(ttl):
+        logger.warning(
+            f"Ignoring invalid GEMINI_MCP_CACHE_TTL={env_value!r}; "
+            "expected a number of seconds, so the cache is disabled"
+        )
+        return 0.0
+    return ttl
+
+
+class _KeyLock:
+    """Lock shared by concurrent calls with one cache key, freed once unused."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+def _file_stamps(paths: list[str]) -> list[str]:
+    """Stamp each path with its modification time so edited files miss the cache."""
+    return [f"{path}:{os.stat(path).st_mtime_ns}" for path in paths]
+
+
+@contextlib.asynccontextmanager
+async def _kill_on_error(process: asyncio.subprocess.Process) -> AsyncIterator[None]:
+    """Kill and reap ``process`` if the body raises or is cancelled."""
+    try:
+        yield
+    except BaseException:
+        if process.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+        await process.wait()
+        raise
+
+
+@functools.lru_cache(maxsize=1)
+def _find_gemini() -> str | None:
+    """Locate the Gemini CLI on PATH, scanning PATH only once per process."""
+    return shutil.which("gemini")
+
 
 class GeminiTools:
     """Tools for interacting with Gemini CLI."""
@@ -28,7 +326,7 @@ class GeminiTools:
             allowed_directories: List of directories that files can be read from.
                                 If None, defaults to current working directory.
         """
-        gemini_path = shutil.which("gemini")
+        gemini_path = _find_gemini()
         if not gemini_path:
             raise RuntimeError("Gemini CLI not found in PATH")
         self.gemini_path: str = gemini_path
@@ -40,131 +338,61 @@ class GeminiTools:
         else:
             self.allowed_directories = [Path(d).resolve() for d in allowed_directories]
 
+        # Precompute (directory, directory + separator) string pairs so path
+        # validation is a plain string comparison instead of relative_to()
+        self._allowed_prefixes: tuple[tuple[str, str], ...] = tuple(
+            (directory, directory if directory.endswith(os.sep) else directory + os.sep)
+            for directory in (os.path.normcase(str(d)) for d in self.allowed_directories)
+        )
+
         logger.info(f"Allowed directories: {[str(d) for d in self.allowed_directories]}")
 
+        # Opt-in LRU cache of (timestamp, response) keyed on the exact command and
+        # inputs; GEMINI_MCP_CACHE_TTL also enables it and expires entries
+        self._cache_ttl = _parse_cache_ttl(os.environ.get("GEMINI_MCP_CACHE_TTL"))
+        self._response_cache: OrderedDict[str, tuple[float, str]] | None = (
+            OrderedDict()
+            if self._cache_ttl > 0 or os.environ.get("GEMINI_MCP_CACHE") == "1"
+            else None
+        )
+        self._cache_locks: dict[str, _KeyLock] = {}
+
+        # Bound concurrent Gemini CLI processes so pipelined requests overlap
+        # without spawning an unbounded number of subprocesses
+        self._semaphore = asyncio.Semaphore(
+            _parse_max_concurrency(os.environ.get("GEMINI_MCP_MAX_CONCURRENCY"))
+        )
+
+        # Tool name -> handler, so call_tool dispatches with a single lookup
+        self._handlers: dict[str, ToolHandler] = {
+            "gemini_prompt": functools.partial(self._run_template, _prompt_template),
+            "gemini_research": functools.partial(self._run_template, _research_template),
+            "gemini_analyze_code": functools.partial(self._run_template, _analyze_code_template),
+            "gemini_summarize": self._gemini_summarize,
+            "gemini_batch": self._gemini_batch,
+        }
+
     def get_tool_definitions(self) -> list[Tool]:
         """Get the list of available tools."""
-        return [
-            Tool(
-                name="gemini_prompt",
-                description="Send a prompt to Gemini CLI and get a response",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "prompt": {
-                            "type": "string",
-                            "description": "The prompt to send to Gemini",
-                        },
-                        "model": {
-                            "type": "string",
-                            "description": f"The model to use (default: {DEFAULT_GEMINI_MODEL})",
-                            "default": DEFAULT_GEMINI_MODEL,
-                        },
-                        "context": {
-                            "type": "string",
-                            "description": "Additional context to prepend to the prompt",
-                        },
-                    },
-                    "required": ["prompt"],
-                },
-            ),
-            Tool(
-                name="gemini_research",
-                description="Use Gemini to research a topic with optional file context",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "topic": {
-                            "type": "string",
-                            "description": "The research topic or question",
-                        },
-                        "files": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "List of file paths to include as context",
-                        },
-                        "model": {
-                            "type": "string",
-                            "description": f"The model to use (default: {DEFAULT_GEMINI_MODEL})",
-                            "default": DEFAULT_GEMINI_MODEL,
-                        },
-                    },
-                    "required": ["topic"],
-                },
-            ),
-            Tool(
-                name="gemini_analyze_code",
-                description="Use Gemini to analyze code files",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "files": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "List of code files to analyze",
-                        },
-                        "analysis_type": {
-                            "type": "string",
-                            "description": "Type of analysis to perform",
-                            "enum": ["review", "explain", "optimize", "security", "test"],
-                        },
-                        "specific_question": {
-                            "type": "string",
-                            "description": "Specific question about the code",
-                        },
-                        "model": {
-                            "type": "string",
-                            "description": f"The model to use (default: {DEFAULT_GEMINI_MODEL})",
-                            "default": DEFAULT_GEMINI_MODEL,
-                        },
-                    },
-                    "required": ["files", "analysis_type"],
-                },
-            ),
-            Tool(
-                name="gemini_summarize",
-                description="Use Gemini to summarize content from files or text",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "content": {
-                            "type": "string",
-                            "description": "Text content to summarize",
-                        },
-                        "files": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Files to summarize (alternative to content)",
-                        },
-                        "summary_type": {
-                            "type": "string",
-                            "description": "Type of summary",
-                            "enum": ["brief", "detailed", "bullet_points", "executive"],
-                            "default": "brief",
-                        },
-                        "model": {
-                            "type": "string",
-                            "description": f"The model to use (default: {DEFAULT_GEMINI_MODEL})",
-                            "default": DEFAULT_GEMINI_MODEL,
-                        },
-                    },
-                    "required": [],
-                },
-            ),
-        ]
-
-    async def call_tool(self, name: str, arguments: dict[str, Any]) -> str:
-        """Call a specific tool."""
-        if name == "gemini_prompt":
-            return await self._gemini_prompt(arguments)
-        elif name == "gemini_research":
-            return await self._gemini_research(arguments)
-        elif name == "gemini_analyze_code":
-            return await self._gemini_analyze_code(arguments)
-        elif name == "gemini_summarize":
-            return await self._gemini_summarize(arguments)
-        else:
+        return list(_TOOL_DEFS)
+
+    async def call_tool(
+        self, name: str, arguments: dict[str, Any], on_output: OutputCallback | None = None
+    ) -> str:
+        """Call a specific tool.
+
+        Args:
+            name: Name of the tool to call
+            arguments: Tool arguments
+            on_output: Optional callback receiving Gemini output as it arrives
+
+        Returns:
+            The complete tool output
+        """
+        handler = self._handlers.get(name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {name}")
+        return await handler(arguments, on_output)
 
     def _validate_file_path(self, file_path: str) -> Path:
         """Validate that a file path is within allowed directories.
@@ -178,31 +406,64 @@ class GeminiTools:
         Raises:
             ValueError: If path is outside allowed directories
         """
-        # Resolve the path to handle .. and symlinks
+        return Path(self._resolve_allowed_path(file_path))
+
+    def _resolve_allowed_path(self, file_path: str) -> str:
+        """Resolve a path and check it against the allowed directories.
+
+        Args:
+            file_path: Path to validate
+
+        Returns:
+            Resolved path as a string
+
+        Raises:
+            ValueError: If path is outside allowed directories
+        """
+        # Resolve the path to handle .. and symlinks; os.path.realpath is what
+        # Path.resolve() uses, without building intermediate Path objects
         try:
-            resolved_path = Path(file_path).resolve()
+            resolved_path = os.path.realpath(file_path)
         except Exception as e:
             raise ValueError(f"Invalid file path: {file_path}") from e
 
         # Check if the resolved path is within any allowed directory
-        for allowed_dir in self.allowed_directories:
-            try:
-                resolved_path.relative_to(allowed_dir)
+        path_str = os.path.normcase(resolved_path)
+        for directory, prefix in self._allowed_prefixes:
+            if path_str == directory or path_str.startswith(prefix):
                 return resolved_path
-            except ValueError:
-                continue
 
         raise ValueError(
             f"File path '{file_path}' is outside allowed directories. "
             f"Allowed: {[str(d) for d in self.allowed_directories]}"
         )
 
+    def _validate_existing_file(self, file_path: str) -> str:
+        """Validate that a file path is allowed and exists.
+
+        Args:
+            file_path: Path to validate
+
+        Returns:
+            Resolved path as a string
+
+        Raises:
+            ValueError: If path is outside allowed directories or does not exist
+        """
+        # Always resolve afresh: symlinks can be retargeted between calls, so a
+        # previously validated resolution can't be reused for the same input
+        validated_path = self._resolve_allowed_path(file_path)
+        if not os.path.exists(validated_path):
+            raise ValueError(f"File does not exist: {file_path}")
+        return validated_path
+
     async def _run_gemini_command(
         self,
         prompt: str,
         model: str = DEFAULT_GEMINI_MODEL,
         files: list[str] | None = None,
         stdin_input: str | None = None,
+        on_output: OutputCallback | None = None,
     ) -> str:
         """Run a Gemini CLI command and return the output.
 
@@ -211,6 +472,7 @@ class GeminiTools:
             model: The model to use
             files: Optional list of file paths to include
             stdin_input: Optional input to send via stdin
+            on_output: Optional callback receiving output as it arrives
 
         Returns:
             Command output as string
@@ -221,38 +483,67 @@ class GeminiTools:
         """
         cmd = [self.gemini_path, "-m", model, "-p", prompt]
 
-        temp_file_list = None
+        validated_paths: list[str] = []
+        if files:
+            # Validate all file paths first; each check is blocking filesystem
+            # work, so run them concurrently in worker threads (order is kept)
+            validated_paths = await asyncio.gather(
+                *(asyncio.to_thread(self._validate_existing_file, p) for p in files)
+            )
+
+            # Add all files flag; the CLI receives the file list via stdin
+            cmd.append("-a")
+            stdin_input = stdin_input or ("\n".join(validated_paths) + "\n")
+
+        if self._response_cache is None:
+            return await self._spawn_gemini(cmd, stdin_input, on_output)
+
+        # Key on the validated paths' mtimes so edited files miss the cache
+        stamps = await asyncio.to_thread(_file_stamps, validated_paths)
+        cache_key = hashlib.blake2b(
+            "\0".join([*cmd, stdin_input or "", *stamps]).encode(), digest_size=16
+        ).hexdigest()
+
+        # Concurrent identical calls share a lock, so only the first one reaches
+        # Gemini and the rest are answered from its cached result
+        key_lock = self._cache_locks.setdefault(cache_key, _KeyLock())
+        key_lock.users += 1
         try:
-            if files:
-                # Validate all file paths first
-                validated_paths = []
-                for file_path in files:
-                    validated_path = self._validate_file_path(file_path)
-                    if not validated_path.exists():
-                        raise ValueError(f"File does not exist: {file_path}")
-                    validated_paths.append(str(validated_path))
-
-                # Create a temporary file listing all files to include
-                fd, temp_file_list = tempfile.mkstemp(suffix=".txt", text=True)
-                try:
-                    # Write file paths using regular file operations to ensure proper cleanup
-                    with os.fdopen(fd, "w") as f:
-                        for path in validated_paths:
-                            f.write(f"{path}\n")
-
-                    # Now fd is closed, safe to read the file
-                    async with aiofiles.open(temp_file_list) as f:
-                        file_list_content = await f.read()
-
-                    # Add all files flag
-                    cmd.append("-a")
-                    stdin_input = stdin_input if stdin_input else file_list_content
-                except Exception:
-                    # fd is already closed by fdopen, no need to close it again
-                    raise
-
-            logger.debug(f"Running command: {' '.join(cmd)}")
+            async with key_lock.lock:
+                cached = self._response_cache.get(cache_key)
+                if cached is not None:
+                    if self._cache_ttl <= 0 or time.monotonic() - cached[0] < self._cache_ttl:
+                        logger.debug("Serving Gemini response from cache")
+                        self._response_cache.move_to_end(cache_key)
+                        if on_output is not None:
+                            await on_output(cached[1])
+                        return cached[1]
+                    del self._response_cache[cache_key]
+
+                output = await self._spawn_gemini(cmd, stdin_input, on_output)
+                self._response_cache[cache_key] = (time.monotonic(), output)
+                if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                    self._response_cache.popitem(last=False)
+                return output
+        finally:
+            key_lock.users -= 1
+            if not key_lock.users:
+                del self._cache_locks[cache_key]
 
+    async def _spawn_gemini(
+        self, cmd: list[str], stdin_input: str | None, on_output: OutputCallback | None
+    ) -> str:
+        """Spawn the Gemini CLI for a prepared command and return its output.
+
+        Raises:
+            RuntimeError: If command execution fails
+        """
+        # The command holds the full prompt, so only join it when it will be logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Running command: %s", " ".join(cmd))
+
+        stdin_bytes = stdin_input.encode() if stdin_input else None
+        async with self._semaphore:
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdin=asyncio.subprocess.PIPE,
@@ -260,122 +551,138 @@ class GeminiTools:
                 stderr=asyncio.subprocess.PIPE,
             )
 
-            stdout, stderr = await process.communicate(
-                input=stdin_input.encode() if stdin_input else None
-            )
-
-            if process.returncode != 0:
-                error_msg = stderr.decode().strip()
-
-                # Check for authentication errors
-                if any(
-                    phrase in error_msg.lower()
-                    for phrase in ["not authenticated", "login required", "auth", "credentials"]
-                ):
-                    raise RuntimeError(
-                        f"Gemini CLI authentication error: {error_msg}\n"
-                        "Please run 'gemini auth login' to authenticate."
-                    )
-
-                raise RuntimeError(f"Gemini CLI error: {error_msg}")
-
-            return stdout.decode().strip()
-
-        finally:
-            # Always clean up the temporary file
-            if temp_file_list and os.path.exists(temp_file_list):
-                try:
-                    os.remove(temp_file_list)
-                except Exception as e:
-                    logger.warning(f"Failed to remove temporary file {temp_file_list}: {e}")
-
-    async def _gemini_prompt(self, arguments: dict[str, Any]) -> str:
-        """Send a simple prompt to Gemini."""
-        prompt = arguments["prompt"]
-        model = arguments.get("model", DEFAULT_GEMINI_MODEL)
-        context = arguments.get("context", "")
+            # Reap the process before the slot is released, so a cancelled or
+            # failed call can't leave a Gemini CLI running past the limit
+            async with _kill_on_error(process):
+                if on_output is None:
+                    stdout, stderr = await process.communicate(input=stdin_bytes)
+                else:
+                    stdout, stderr = await self._stream_output(process, stdin_bytes, on_output)
 
-        full_prompt = f"{context}\n\n{prompt}" if context else prompt
+        if process.returncode != 0:
+            error_msg = stderr.decode().strip()
 
-        return await self._run_gemini_command(prompt=full_prompt, model=model)
+            # Check for authentication errors
+            if _AUTH_ERR_RE.search(error_msg):
+                raise RuntimeError(
+                    f"Gemini CLI authentication error: {error_msg}\n"
+                    "Please run 'gemini auth login' to authenticate."
+                )
 
-    async def _gemini_research(self, arguments: dict[str, Any]) -> str:
-        """Research a topic using Gemini."""
-        topic = arguments["topic"]
-        files = arguments.get("files", [])
-        model = arguments.get("model", DEFAULT_GEMINI_MODEL)
+            raise RuntimeError(f"Gemini CLI error: {error_msg}")
 
-        research_prompt = f"""Please research the following topic and provide a comprehensive analysis:
+        return stdout.decode().strip()
 
-Topic: {topic}
+    async def _stream_output(
+        self,
+        process: asyncio.subprocess.Process,
+        stdin_bytes: bytes | None,
+        on_output: OutputCallback,
+    ) -> tuple[bytes, bytes]:
+        """Feed stdin and forward stdout in chunks while the process runs.
 
-Please include:
-1. Overview and background
-2. Key findings and insights
-3. Relevant details and examples
-4. Conclusions and recommendations
+        Output is read in fixed-size chunks rather than lines, so very long
+        lines can't overrun the stream reader's buffer limit.
 
-Be thorough but concise."""
+        Args:
+            process: Process started with piped stdin, stdout and stderr
+            stdin_bytes: Optional input to send via stdin
+            on_output: Callback receiving each decoded chunk of stdout
 
-        return await self._run_gemini_command(
-            prompt=research_prompt,
-            model=model,
-            files=files,
-        )
+        Returns:
+            Tuple of (stdout, stderr) bytes, as from ``communicate()``
+        """
+        stdin, stdout, stderr = process.stdin, process.stdout, process.stderr
+        if stdin is None or stdout is None or stderr is None:
+            raise RuntimeError("Gemini CLI process was started without pipes")
 
-    async def _gemini_analyze_code(self, arguments: dict[str, Any]) -> str:
-        """Analyze code using Gemini."""
-        files = arguments["files"]
-        analysis_type = arguments["analysis_type"]
-        specific_question = arguments.get("specific_question", "")
+        async def feed_stdin() -> None:
+            # Like communicate(), tolerate the CLI exiting before reading its
+            # input, so the error it printed to stderr is what gets reported
+            try:
+                if stdin_bytes:
+                    stdin.write(stdin_bytes)
+                    await stdin.drain()
+            except (BrokenPipeError, ConnectionResetError) as e:
+                logger.debug(f"Gemini CLI closed stdin early: {e!r}")
+            stdin.close()
+
+        async def read_stdout() -> bytes:
+            output = bytearray()
+            # Chunks may split multi-byte characters, so decode incrementally
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            while chunk := await stdout.read(STREAM_CHUNK_SIZE):
+                output.extend(chunk)
+                text = decoder.decode(chunk)
+                if text:
+                    await on_output(text)
+            return bytes(output)
+
+        # Read both pipes concurrently so a full stderr buffer can't stall the process
+        _, out, err = await asyncio.gather(feed_stdin(), read_stdout(), stderr.read())
+        await process.wait()
+        return out, err
+
+    async def _run_template(
+        self,
+        template: PromptTemplate,
+        arguments: dict[str, Any],
+        on_output: OutputCallback | None = None,
+    ) -> str:
+        """Build a prompt from a template and run it through Gemini."""
+        prompt, files = template(arguments)
         model = arguments.get("model", DEFAULT_GEMINI_MODEL)
 
-        analysis_prompts = {
-            "review": "Please review this code and identify potential issues, bugs, or areas for improvement.",
-            "explain": "Please explain what this code does in detail, including its purpose and how it works.",
-            "optimize": "Please suggest optimizations for this code to improve performance, readability, or maintainability.",
-            "security": "Please analyze this code for security vulnerabilities and suggest fixes.",
-            "test": "Please suggest test cases and testing strategies for this code.",
-        }
-
-        base_prompt = analysis_prompts.get(analysis_type, "Please analyze this code.")
-
-        if specific_question:
-            prompt = f"{base_prompt}\n\nSpecific question: {specific_question}"
-        else:
-            prompt = base_prompt
-
         return await self._run_gemini_command(
             prompt=prompt,
             model=model,
             files=files,
+            on_output=on_output,
         )
 
-    async def _gemini_summarize(self, arguments: dict[str, Any]) -> str:
+    async def _gemini_summarize(
+        self, arguments: dict[str, Any], on_output: OutputCallback | None = None
+    ) -> str:
         """Summarize content using Gemini."""
-        content = arguments.get("content", "")
-        files = arguments.get("files", [])
-        summary_type = arguments.get("summary_type", "brief")
-        model = arguments.get("model", DEFAULT_GEMINI_MODEL)
-
-        if not content and not files:
+        if not arguments.get("content") and not arguments.get("files"):
             return "Error: Either content or files must be provided for summarization."
 
-        summary_prompts = {
-            "brief": "Please provide a brief summary of the following content in 2-3 sentences.",
-            "detailed": "Please provide a detailed summary of the following content, covering all main points.",
-            "bullet_points": "Please summarize the following content as bullet points.",
-            "executive": "Please provide an executive summary of the following content suitable for decision makers.",
-        }
+        return await self._run_template(_summarize_template, arguments, on_output)
 
-        prompt = summary_prompts.get(summary_type, summary_prompts["brief"])
+    async def _gemini_batch(
+        self, arguments: dict[str, Any], on_output: OutputCallback | None = None
+    ) -> str:
+        """Answer several prompts with a single Gemini invocation."""
+        prompts = arguments["prompts"]
+        model = arguments.get("model", DEFAULT_GEMINI_MODEL)
 
-        if content:
-            full_prompt = f"{prompt}\n\nContent:\n{content}"
-            return await self._run_gemini_command(prompt=full_prompt, model=model)
-        else:
+        if not prompts:
+            return "Error: At least one prompt must be provided for batching."
+
+        # A single prompt gains nothing from the batch framing
+        if len(prompts) == 1:
             return await self._run_gemini_command(
-                prompt=prompt,
-                model=model,
-                files=files,
+                prompt=prompts[0], model=model, on_output=on_output
             )
+
+        separator = f"\n{BATCH_SEPARATOR}\n"
+        batch_prompt = f"""Please answer each of the following {len(prompts)} prompts independently and in order.
+Separate consecutive answers with a line containing only {BATCH_SEPARATOR} and do not use that line anywhere else.
+
+{separator.join(prompts)}"""
+
+        output = await self._run_gemini_command(
+            prompt=batch_prompt, model=model, on_output=on_output
+        )
+
+        responses = [response.strip() for response in output.split(BATCH_SEPARATOR)]
+        if len(responses) != len(prompts):
+            logger.warning(
+                f"Expected {len(prompts)} batch responses but got {len(responses)}; "
+                "returning the raw output"
+            )
+            return output
+
+        return "\n\n".join(
+            f"Response {i}:\n{response}" for i, response in enumerate(responses, start=1)
+        )
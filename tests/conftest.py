@@ -1,8 +1,9 @@
 """Pytest configuration and shared fixtures."""
 
+import asyncio
 import sys
 from pathlib import Path
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
@@ -10,6 +11,16 @@ import pytest
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 
+@pytest.fixture(autouse=True)
+def clear_gemini_path_cache():
+    """Clear the cached Gemini CLI lookup so each test sees its own PATH mock."""
+    from gemini_mcp.tools import _find_gemini
+
+    _find_gemini.cache_clear()
+    yield
+    _find_gemini.cache_clear()
+
+
 @pytest.fixture
 def mock_gemini_cli():
     """Mock the gemini CLI being available."""
@@ -18,6 +29,24 @@ def mock_gemini_cli():
         yield mock_which
 
 
+@pytest.fixture(scope="module")
+def shared_tools():
+    """GeminiTools instance shared by the read-only tests of a module."""
+    from gemini_mcp.tools import GeminiTools
+
+    with patch("shutil.which", return_value="/usr/local/bin/gemini"):
+        return GeminiTools()
+
+
+@pytest.fixture(scope="module")
+def shared_server():
+    """GeminiMCPServer instance shared by the read-only tests of a module."""
+    from gemini_mcp.server import GeminiMCPServer
+
+    with patch("shutil.which", return_value="/usr/local/bin/gemini"):
+        return GeminiMCPServer()
+
+
 @pytest.fixture
 def temp_directory(tmp_path):
     """Create a temporary directory for testing file operations."""
@@ -45,6 +74,60 @@ async def mock_subprocess():
         yield mock_create, mock_process
 
 
+class FakeProcess:
+    """Lightweight stand-in for an asyncio subprocess with a fixed result.
+
+    If ``error`` is given, ``communicate`` raises it instead of returning.
+    """
+
+    def __init__(self, returncode=0, stdout=b"Mocked Gemini output", stderr=b"", error=None):
+        self.returncode = returncode
+        self._stdout = stdout
+        self._stderr = stderr
+        self._error = error
+        self.killed = False
+
+    async def communicate(self, input=None):
+        if self._error is not None:
+            raise self._error
+        return self._stdout, self._stderr
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+    async def wait(self):
+        return self.returncode
+
+
+@pytest.fixture
+def make_fake_process():
+    """Factory for fake subprocesses, cheaper than building an AsyncMock tree."""
+    return FakeProcess
+
+
+def _streaming_process(stdout=b"", stderr=b"", returncode=0):
+    """Create a mock process whose stdout and stderr are real stream readers."""
+    process = Mock()
+    process.returncode = returncode
+    process.stdin = Mock()
+    process.stdin.drain = AsyncMock()
+    process.stdout = asyncio.StreamReader()
+    process.stdout.feed_data(stdout)
+    process.stdout.feed_eof()
+    process.stderr = asyncio.StreamReader()
+    process.stderr.feed_data(stderr)
+    process.stderr.feed_eof()
+    process.wait = AsyncMock()
+    return process
+
+
+@pytest.fixture
+def make_streaming_process():
+    """Factory for mock subprocesses read through their stdout and stderr streams."""
+    return _streaming_process
+
+
 @pytest.fixture
 def sample_tool_arguments():
     """Sample arguments for different tools."""
@@ -1,10 +1,13 @@
 """Tests for CLI commands."""
 
+import asyncio
+import sys
 from unittest.mock import Mock, patch
 
+import pytest
 from click.testing import CliRunner
 
-from gemini_mcp.__main__ import cli
+from gemini_mcp.__main__ import cli, run_async, setup_logging
 
 
 class TestCLI:
@@ -19,7 +22,7 @@ class TestCLI:
             mock_server.run = Mock()
             mock_server_class.return_value = mock_server
 
-            with patch("asyncio.run"):
+            with patch("gemini_mcp.__main__.run_async"):
                 runner.invoke(cli, [])
 
                 # Should create and try to run server
@@ -35,58 +38,53 @@ class TestCLI:
             assert result.exit_code == 0
             assert "Gemini CLI not found" in result.output
 
-    def test_test_command_with_auth_error(self, mock_gemini_cli):
+    def test_test_command_with_auth_error(self, mock_gemini_cli, make_fake_process):
         """Test the test command with authentication error."""
         runner = CliRunner()
 
-        mock_result = Mock()
-        mock_result.returncode = 1
-        mock_result.stdout = ""
-        mock_result.stderr = "Error: User not authenticated. Please run 'gemini auth login'"
+        mock_process = make_fake_process(
+            returncode=1,
+            stdout=b"",
+            stderr=b"Error: User not authenticated. Please run 'gemini auth login'",
+        )
 
-        with patch("subprocess.run", return_value=mock_result):
+        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
             result = runner.invoke(cli, ["test"])
 
             assert result.exit_code == 0
             assert "not authenticated" in result.output
             assert "gemini auth login" in result.output
 
-    def test_setup_command_all_good(self, mock_gemini_cli):
+    def test_setup_command_all_good(self, mock_gemini_cli, make_fake_process):
         """Test setup command when everything is configured."""
         runner = CliRunner()
 
         # Mock successful subprocess calls
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_result.stdout = "gemini version 1.0.0"
-        mock_result.stderr = ""
+        mock_process = make_fake_process(stdout=b"gemini version 1.0.0")
 
-        with patch("subprocess.run", return_value=mock_result):
+        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
             result = runner.invoke(cli, ["setup"])
 
             assert result.exit_code == 0
             assert "Everything looks good" in result.output
 
-    def test_setup_command_auth_needed(self, mock_gemini_cli):
+    def test_setup_command_auth_needed(self, mock_gemini_cli, make_fake_process):
         """Test setup command when authentication is needed."""
         runner = CliRunner()
 
         # Mock version check success but auth failure
-        version_result = Mock()
-        version_result.returncode = 0
-        version_result.stdout = "gemini version 1.0.0"
+        version_process = make_fake_process(stdout=b"gemini version 1.0.0")
+        auth_process = make_fake_process(
+            returncode=1, stdout=b"", stderr=b"Error: Not authenticated"
+        )
 
-        auth_result = Mock()
-        auth_result.returncode = 1
-        auth_result.stderr = "Error: Not authenticated"
-
-        def mock_run(cmd, **kwargs):
+        def mock_exec(*cmd, **kwargs):
             if "--version" in cmd:
-                return version_result
+                return version_process
             else:
-                return auth_result
+                return auth_process
 
-        with patch("subprocess.run", side_effect=mock_run):
+        with patch("asyncio.create_subprocess_exec", side_effect=mock_exec):
             result = runner.invoke(cli, ["setup"])
 
             assert result.exit_code == 0
@@ -94,6 +92,27 @@ class TestCLI:
             assert "gemini auth login" in result.output
             assert "Some issues need to be resolved" in result.output
 
+    def test_setup_command_auth_timeout(self, mock_gemini_cli, make_fake_process):
+        """Test setup command when the authentication check times out."""
+        runner = CliRunner()
+
+        version_process = make_fake_process(stdout=b"gemini version 1.0.0")
+        auth_process = make_fake_process(error=asyncio.TimeoutError())
+
+        def mock_exec(*cmd, **kwargs):
+            if "--version" in cmd:
+                return version_process
+            else:
+                return auth_process
+
+        with patch("asyncio.create_subprocess_exec", side_effect=mock_exec):
+            result = runner.invoke(cli, ["setup"])
+
+            assert result.exit_code == 0
+            assert "Version: gemini version 1.0.0" in result.output
+            assert "Authentication check timed out" in result.output
+            assert auth_process.killed
+
     def test_list_tools_command(self, mock_gemini_cli):
         """Test list-tools command."""
         runner = CliRunner()
@@ -105,3 +124,45 @@ class TestCLI:
         assert "gemini_research" in result.output
         assert "gemini_analyze_code" in result.output
         assert "gemini_summarize" in result.output
+        assert "gemini_batch" in result.output
+
+
+class TestUvloop:
+    """Test optional uvloop event loop selection."""
+
+    def test_run_async_uses_uvloop_when_installed(self, monkeypatch):
+        """Test that coroutines run on uvloop when it is importable."""
+        fake_uvloop = Mock()
+        monkeypatch.setitem(sys.modules, "uvloop", fake_uvloop)
+        main = Mock()
+
+        with patch("asyncio.run") as mock_run:
+            result = run_async(main)
+
+        fake_uvloop.run.assert_called_once_with(main)
+        mock_run.assert_not_called()
+        assert result is fake_uvloop.run.return_value
+
+    def test_run_async_when_uvloop_missing(self, monkeypatch):
+        """Test that the default event loop is used when uvloop is not installed."""
+        monkeypatch.setitem(sys.modules, "uvloop", None)
+        main = Mock()
+
+        with patch("asyncio.run") as mock_run:
+            result = run_async(main)
+
+        mock_run.assert_called_once_with(main)
+        assert result is mock_run.return_value
+
+
+class TestSetupLogging:
+    """Test logging configuration."""
+
+    @pytest.mark.parametrize("debug", [True, False])
+    def test_rich_tracebacks_only_in_debug(self, debug):
+        """Test that rich tracebacks are only enabled with --debug."""
+        with patch("logging.basicConfig") as mock_basic_config:
+            setup_logging(debug)
+
+        (handler,) = mock_basic_config.call_args.kwargs["handlers"]
+        assert handler.rich_tracebacks is debug
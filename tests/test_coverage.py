@@ -1,7 +1,6 @@
 """Additional tests to improve coverage."""
 
-import os
-import tempfile
+from importlib import metadata
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -41,10 +40,15 @@ class TestServerCoverage:
                 args = mock_run.call_args[0]
                 assert args[0] == mock_read
                 assert args[1] == mock_write
+                assert args[2] is server._init_options
+                assert args[2].capabilities.tools is not None
 
     def test_version_fallback(self):
-        """Test version loading with metadata error."""
-        with patch("gemini_mcp.server.metadata.version", side_effect=Exception("No metadata")):
+        """Test version loading when the package metadata is missing."""
+        with patch(
+            "gemini_mcp.server.metadata.version",
+            side_effect=metadata.PackageNotFoundError("gemini-mcp"),
+        ):
             # Re-import to trigger the version loading
             import importlib
 
@@ -75,6 +79,8 @@ class TestToolsCoverage:
         prompt_idx = call_args.index("-p") + 1
         assert "Python best practices" in call_args[prompt_idx]
         assert "comprehensive analysis" in call_args[prompt_idx]
+        # The topic follows the fixed instructions so the prompt prefix is stable
+        assert call_args[prompt_idx].endswith("Topic: Python best practices")
 
     @pytest.mark.asyncio
     async def test_gemini_analyze_code_tool(self, mock_gemini_cli, mock_subprocess, temp_directory):
@@ -87,19 +93,11 @@ class TestToolsCoverage:
 
         tools = GeminiTools(allowed_directories=[str(temp_directory)])
 
-        # Mock aiofiles
-        with patch("aiofiles.open") as mock_aiofiles:
-            mock_file = AsyncMock()
-            mock_file.__aenter__.return_value = mock_file
-            mock_file.write = AsyncMock()
-            mock_file.read = AsyncMock(return_value=str(test_file) + "\n")
-            mock_aiofiles.return_value = mock_file
-
-            result = await tools.call_tool(
-                "gemini_analyze_code", {"files": [str(test_file)], "analysis_type": "review"}
-            )
+        result = await tools.call_tool(
+            "gemini_analyze_code", {"files": [str(test_file)], "analysis_type": "review"}
+        )
 
-            assert result == "Mocked Gemini output"
+        assert result == "Mocked Gemini output"
 
     @pytest.mark.asyncio
     async def test_gemini_summarize_with_content(self, mock_gemini_cli, mock_subprocess):
@@ -131,19 +129,11 @@ class TestToolsCoverage:
 
         tools = GeminiTools(allowed_directories=[str(temp_directory)])
 
-        # Mock aiofiles
-        with patch("aiofiles.open") as mock_aiofiles:
-            mock_file = AsyncMock()
-            mock_file.__aenter__.return_value = mock_file
-            mock_file.write = AsyncMock()
-            mock_file.read = AsyncMock(return_value=str(test_file) + "\n")
-            mock_aiofiles.return_value = mock_file
-
-            result = await tools.call_tool(
-                "gemini_summarize", {"files": [str(test_file)], "summary_type": "executive"}
-            )
+        result = await tools.call_tool(
+            "gemini_summarize", {"files": [str(test_file)], "summary_type": "executive"}
+        )
 
-            assert result == "Mocked Gemini output"
+        assert result == "Mocked Gemini output"
 
     def test_path_validation_with_invalid_path(self, mock_gemini_cli):
         """Test path validation with malformed paths."""
@@ -151,45 +141,11 @@ class TestToolsCoverage:
 
         # Test with path that can't be resolved
         with (
-            patch("pathlib.Path.resolve", side_effect=Exception("Bad path")),
+            patch("os.path.realpath", side_effect=Exception("Bad path")),
             pytest.raises(ValueError, match="Invalid file path"),
         ):
             tools._validate_file_path("/bad/path")
 
-    @pytest.mark.asyncio
-    async def test_file_descriptor_cleanup_on_write_error(self, mock_gemini_cli, temp_directory):
-        """Test that file descriptors are properly handled even if file operations fail."""
-        tools = GeminiTools(allowed_directories=[str(temp_directory)])
-
-        test_file = temp_directory / "test.txt"
-        test_file.write_text("content")
-
-        # Track temp file creation
-        temp_files_created = []
-        original_mkstemp = tempfile.mkstemp
-
-        def track_mkstemp(*args, **kwargs):
-            fd, path = original_mkstemp(*args, **kwargs)
-            temp_files_created.append((fd, path))
-            return fd, path
-
-        with (
-            patch("tempfile.mkstemp", side_effect=track_mkstemp),
-            patch("os.fdopen", side_effect=Exception("Write failed")),
-            pytest.raises(Exception, match="Write failed"),
-        ):
-            await tools._run_gemini_command("Test", files=[str(test_file)])
-
-        # Verify temp files were created
-        assert len(temp_files_created) > 0
-
-        # Since fdopen failed, the fd should still be open and we need to close it manually
-        import contextlib
-
-        for fd, _path in temp_files_created:
-            with contextlib.suppress(OSError):
-                os.close(fd)
-
 
 class TestMainCoverage:
     """Test __main__.py for coverage."""
@@ -13,33 +13,23 @@ class TestIntegration:
     """Integration tests for real-world scenarios."""
 
     @pytest.mark.asyncio
-    async def test_authentication_error_handling(self, mock_gemini_cli):
+    async def test_authentication_error_handling(self, mock_gemini_cli, make_fake_process):
         """Test handling of Gemini CLI authentication errors."""
         tools = GeminiTools()
 
         # Mock subprocess to simulate authentication error
-        with patch("asyncio.create_subprocess_exec") as mock_create:
-            mock_process = asyncio.create_task(self._mock_auth_error_process())
-            mock_create.return_value = await mock_process
-
-            with pytest.raises(
+        process = make_fake_process(
+            returncode=1,
+            stdout=b"",
+            stderr=b"Error: User not authenticated. Please run 'gemini auth login' first.",
+        )
+        with (
+            patch("asyncio.create_subprocess_exec", return_value=process),
+            pytest.raises(
                 RuntimeError, match="not authenticated|login required|authentication failed"
-            ):
-                await tools._run_gemini_command("Test prompt")
-
-    async def _mock_auth_error_process(self):
-        """Helper to create a mock process that returns auth error."""
-
-        class MockProcess:
-            returncode = 1
-
-            async def communicate(self, input=None):
-                return (
-                    b"",
-                    b"Error: User not authenticated. Please run 'gemini auth login' first.",
-                )
-
-        return MockProcess()
+            ),
+        ):
+            await tools._run_gemini_command("Test prompt")
 
     @pytest.mark.asyncio
     async def test_file_not_found_error(self, mock_gemini_cli, temp_directory):
@@ -57,55 +47,49 @@ class TestIntegration:
         mock_create, mock_process = mock_subprocess
         server = GeminiMCPServer()
 
-        # Create multiple concurrent tool calls
-        tasks = []
-        for i in range(5):
-            task = server.tools.call_tool("gemini_prompt", {"prompt": f"Question {i}"})
-            tasks.append(task)
+        # Hold each call inside communicate() until all of them have arrived,
+        # which can only happen if the calls really run concurrently
+        arrived = 0
+        all_arrived = asyncio.Event()
+
+        async def communicate(input=None):
+            nonlocal arrived
+            arrived += 1
+            if arrived == 5:
+                all_arrived.set()
+            await all_arrived.wait()
+            return (b"Mocked Gemini output", b"")
+
+        mock_process.communicate.side_effect = communicate
 
         # All should complete successfully
-        results = await asyncio.gather(*tasks)
-        assert len(results) == 5
-        for result in results:
-            assert result == "Mocked Gemini output"
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(
+                    server.tools.call_tool("gemini_prompt", {"prompt": f"Question {i}"})
+                    for i in range(5)
+                )
+            ),
+            timeout=5,
+        )
+        assert results == ["Mocked Gemini output"] * 5
 
     @pytest.mark.asyncio
-    async def test_large_file_handling(self, mock_gemini_cli, mock_subprocess, tmp_path):
-        """Test handling of large files."""
+    async def test_file_reference_handling(self, mock_gemini_cli, mock_subprocess, tmp_path):
+        """Test that attached files are passed by reference, whatever their size."""
         mock_create, mock_process = mock_subprocess
 
-        # Create a large file
-        large_file = tmp_path / "large.txt"
-        large_file.write_text("x" * 1_000_000)  # 1MB file
+        # Only the path reaches the CLI, so the file just needs to exist
+        attached_file = tmp_path / "attached.txt"
+        attached_file.touch()
 
         tools = GeminiTools(allowed_directories=[str(tmp_path)])
 
-        # Mock aiofiles for the test
-        with patch("aiofiles.open") as mock_aiofiles:
-            mock_file = asyncio.create_task(self._mock_async_file(str(large_file)))
-            mock_aiofiles.return_value = await mock_file
-
-            result = await tools._run_gemini_command("Summarize this", files=[str(large_file)])
+        result = await tools._run_gemini_command("Summarize this", files=[str(attached_file)])
 
-            assert result == "Mocked Gemini output"
-
-    async def _mock_async_file(self, filepath):
-        """Helper to create a mock async file."""
-
-        class MockAsyncFile:
-            async def __aenter__(self):
-                return self
-
-            async def __aexit__(self, *args):
-                pass
-
-            async def write(self, data):
-                pass
-
-            async def read(self):
-                return f"{filepath}\n"
-
-        return MockAsyncFile()
+        assert result == "Mocked Gemini output"
+        stdin_data = mock_process.communicate.call_args[1]["input"]
+        assert stdin_data.decode() == f"{attached_file.resolve()}\n"
 
     @pytest.mark.asyncio
     async def test_timeout_handling(self, mock_gemini_cli):
@@ -114,17 +98,19 @@ class TestIntegration:
 
         # Mock subprocess to simulate a hanging process
         with patch("asyncio.create_subprocess_exec") as mock_create:
-            mock_process = asyncio.create_task(self._mock_hanging_process())
-            mock_create.return_value = await mock_process
+            mock_create.return_value = self._mock_hanging_process()
 
             # This should eventually timeout or handle the hanging process
             with pytest.raises(asyncio.TimeoutError):
                 await asyncio.wait_for(
                     tools._run_gemini_command("Test prompt"),
-                    timeout=0.1,  # Short timeout for test
+                    timeout=0.001,  # The mock never returns, so any timeout will expire
                 )
 
-    async def _mock_hanging_process(self):
+        # The timed-out process must not be left running
+        assert mock_create.return_value.returncode == -9
+
+    def _mock_hanging_process(self):
         """Helper to create a mock process that hangs."""
 
         class MockProcess:
@@ -135,14 +121,39 @@ class TestIntegration:
                 await asyncio.sleep(10)
                 return (b"", b"")
 
+            def kill(self):
+                self.returncode = -9
+
+            async def wait(self):
+                return self.returncode
+
         return MockProcess()
 
 
+# Path traversal attempts; {safe} and {secret} are filled in per test
+MALICIOUS_PATHS = [
+    "{safe}/../secret/secret.txt",
+    "../secret/secret.txt",
+    "{secret}/secret.txt",
+    "/etc/passwd",
+    "~/.ssh/id_rsa",
+]
+
+# Shell metacharacters that must reach Gemini verbatim rather than be interpreted
+MALICIOUS_PROMPTS = [
+    "'; rm -rf /; echo '",
+    "$(whoami)",
+    "`id`",
+    "& calc.exe &",
+]
+
+
 class TestSecurityIntegration:
     """Security-focused integration tests."""
 
     @pytest.mark.asyncio
-    async def test_path_traversal_prevention(self, mock_gemini_cli, tmp_path):
+    @pytest.mark.parametrize("path", MALICIOUS_PATHS)
+    async def test_path_traversal_prevention(self, mock_gemini_cli, tmp_path, path):
         """Test that path traversal attacks are prevented."""
         safe_dir = tmp_path / "safe"
         safe_dir.mkdir()
@@ -152,39 +163,20 @@ class TestSecurityIntegration:
 
         tools = GeminiTools(allowed_directories=[str(safe_dir)])
 
-        # Various path traversal attempts
-        malicious_paths = [
-            str(safe_dir / ".." / "secret" / "secret.txt"),
-            "../secret/secret.txt",
-            str(secret_dir / "secret.txt"),
-            "/etc/passwd",
-            "~/.ssh/id_rsa",
-        ]
-
-        for path in malicious_paths:
-            with pytest.raises(ValueError, match="outside allowed directories"):
-                tools._validate_file_path(path)
+        with pytest.raises(ValueError, match="outside allowed directories"):
+            tools._validate_file_path(path.format(safe=safe_dir, secret=secret_dir))
 
     @pytest.mark.asyncio
-    async def test_command_injection_prevention(self, mock_gemini_cli, mock_subprocess):
+    @pytest.mark.parametrize("prompt", MALICIOUS_PROMPTS)
+    async def test_command_injection_prevention(self, mock_gemini_cli, mock_subprocess, prompt):
         """Test that command injection is prevented."""
         mock_create, mock_process = mock_subprocess
         tools = GeminiTools()
 
-        # Attempt command injection through various parameters
-        malicious_prompts = [
-            "'; rm -rf /; echo '",
-            "$(whoami)",
-            "`id`",
-            "& calc.exe &",
-        ]
-
-        for prompt in malicious_prompts:
-            await tools._run_gemini_command(prompt)
-
-            # Verify the command was properly escaped
-            call_args = mock_create.call_args[0]
-            # The prompt should be passed as a single argument, not interpreted
-            assert prompt in call_args
-            # Should not have shell=True or similar unsafe execution
-            assert all(isinstance(arg, str) for arg in call_args)
+        await tools._run_gemini_command(prompt)
+
+        call_args = mock_create.call_args.args
+        # The prompt should be passed as the single argument after -p, not interpreted
+        assert call_args[call_args.index("-p") + 1] == prompt
+        # Should not have shell=True or similar unsafe execution
+        assert all(isinstance(arg, str) for arg in call_args)
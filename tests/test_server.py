@@ -1,13 +1,31 @@
 """Tests for the MCP server implementation."""
 
+import logging
 import os
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+from mcp.types import (
+    CallToolRequest,
+    CallToolRequestParams,
+    ListToolsRequest,
+    RequestParams,
+    SetLevelRequest,
+    SetLevelRequestParams,
+)
 
 from gemini_mcp.server import GeminiMCPServer, __version__
 
 
+def _call_tool_request(name, arguments):
+    """Build an MCP tools/call request."""
+    return CallToolRequest(
+        method="tools/call", params=CallToolRequestParams(name=name, arguments=arguments)
+    )
+
+
 class TestGeminiMCPServer:
     """Test cases for GeminiMCPServer."""
 
@@ -36,23 +54,33 @@ class TestGeminiMCPServer:
         with patch.dict(os.environ, {"GEMINI_MCP_ALLOWED_DIRS": f"{dir1}{os.pathsep}{dir2}"}):
             server = GeminiMCPServer()
             assert len(server.tools.allowed_directories) == 2
-            allowed_paths = [str(d) for d in server.tools.allowed_directories]
-            assert str(dir1.resolve()) in allowed_paths
-            assert str(dir2.resolve()) in allowed_paths
+            assert set(server.tools.allowed_directories) == {dir1.resolve(), dir2.resolve()}
 
-    def test_list_tools(self, mock_gemini_cli):
+    def test_list_tools(self, shared_server):
         """Test listing available tools."""
-        server = GeminiMCPServer()
-
         # Get tools directly from the tools instance
-        tools = server.tools.get_tool_definitions()
+        tools = shared_server.tools.get_tool_definitions()
 
-        assert len(tools) == 4
+        assert len(tools) == 5
         tool_names = [tool.name for tool in tools]
         assert "gemini_prompt" in tool_names
         assert "gemini_research" in tool_names
         assert "gemini_analyze_code" in tool_names
         assert "gemini_summarize" in tool_names
+        assert "gemini_batch" in tool_names
+
+    @pytest.mark.asyncio
+    async def test_list_tools_handler_reuses_definitions(self, mock_gemini_cli):
+        """Test that the list_tools handler returns the prebuilt tool definitions."""
+        server = GeminiMCPServer()
+        handler = server.server.request_handlers[ListToolsRequest]
+
+        first = await handler(ListToolsRequest(method="tools/list"))
+        second = await handler(ListToolsRequest(method="tools/list"))
+
+        assert first.root.tools == second.root.tools == server.tools.get_tool_definitions()
+        # The schemas are built once at import, not per request
+        assert all(a is b for a, b in zip(first.root.tools, second.root.tools, strict=True))
 
     @pytest.mark.asyncio
     async def test_call_tool_success(self, mock_gemini_cli, mock_subprocess):
@@ -66,13 +94,57 @@ class TestGeminiMCPServer:
         assert result == "Mocked Gemini output"
 
     @pytest.mark.asyncio
-    async def test_call_tool_error(self, mock_gemini_cli):
+    async def test_call_tool_error(self, shared_server):
         """Test tool execution error handling."""
-        server = GeminiMCPServer()
-
         # Test with an invalid tool name
         with pytest.raises(ValueError, match="Unknown tool"):
-            await server.tools.call_tool("invalid_tool", {"prompt": "Test"})
+            await shared_server.tools.call_tool("invalid_tool", {"prompt": "Test"})
+
+    @pytest.mark.asyncio
+    async def test_call_tool_cache_disabled_by_default(self, mock_gemini_cli):
+        """Test that identical tool calls reach Gemini each time without a cache TTL."""
+        server = GeminiMCPServer()
+
+        handler = server.server.request_handlers[CallToolRequest]
+        with patch.object(server.tools, "call_tool", return_value="ok") as mock_call:
+            for _ in range(2):
+                await handler(_call_tool_request("gemini_prompt", {"prompt": "Hello"}))
+
+        assert mock_call.await_count == 2
+
+    def test_progress_callback_without_request(self, mock_gemini_cli):
+        """Test that no progress callback is built outside of a request."""
+        server = GeminiMCPServer()
+        assert server._progress_callback() is None
+
+    @pytest.mark.asyncio
+    async def test_progress_callback_streams_output(self, mock_gemini_cli):
+        """Test that output chunks are sent as progress notifications."""
+        server = GeminiMCPServer()
+        session = AsyncMock()
+        token = request_ctx.set(
+            RequestContext(
+                request_id=7,
+                meta=RequestParams.Meta(progressToken="progress-1"),
+                session=session,
+                lifespan_context=None,
+            )
+        )
+        try:
+            on_output = server._progress_callback()
+        finally:
+            request_ctx.reset(token)
+
+        assert on_output is not None
+        await on_output("first line\n")
+        await on_output("second line\n")
+
+        session.send_progress_notification.assert_any_await(
+            "progress-1", 1, message="first line\n", related_request_id="7"
+        )
+        session.send_progress_notification.assert_any_await(
+            "progress-1", 2, message="second line\n", related_request_id="7"
+        )
 
     def test_set_logging_level(self, mock_gemini_cli):
         """Test that server can be initialized (logging is set during handler registration)."""
@@ -81,6 +153,28 @@ class TestGeminiMCPServer:
         server = GeminiMCPServer()
         assert server.server is not None
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("level", "expected"),
+        [("debug", logging.DEBUG), ("notice", logging.INFO), ("emergency", logging.CRITICAL)],
+    )
+    async def test_set_logging_level_handler(self, mock_gemini_cli, level, expected):
+        """Test that MCP logging levels map onto Python logging levels."""
+        server = GeminiMCPServer()
+        handler = server.server.request_handlers[SetLevelRequest]
+        root_logger = logging.getLogger()
+        original_level = root_logger.level
+
+        try:
+            await handler(
+                SetLevelRequest(
+                    method="logging/setLevel", params=SetLevelRequestParams(level=level)
+                )
+            )
+            assert root_logger.level == expected
+        finally:
+            root_logger.setLevel(original_level)
+
     def test_version_loading(self):
         """Test that version is loaded from package metadata."""
         # The version should be loaded from metadata or fallback
@@ -108,8 +202,5 @@ async def test_server_integration(mock_gemini_cli, mock_subprocess):
     assert result == "Mocked Gemini output"
 
     # Verify the subprocess was called with correct arguments
-    call_args = mock_create.call_args[0]
-    assert "-m" in call_args
-    assert "gemini-2.5-pro" in call_args
-    assert "-p" in call_args
-    assert "What is the capital of France?" in call_args
+    _, *args = mock_create.await_args.args
+    assert {"-m", "gemini-2.5-pro", "-p", "What is the capital of France?"} <= frozenset(args)
@@ -1,13 +1,19 @@
 """Tests for the GeminiTools class."""
 
+import asyncio
 import os
-import tempfile
 from pathlib import Path
-from unittest.mock import AsyncMock, patch
+from unittest.mock import Mock, patch
 
 import pytest
 
-from gemini_mcp.tools import DEFAULT_GEMINI_MODEL, GeminiTools
+from gemini_mcp.tools import (
+    BATCH_SEPARATOR,
+    DEFAULT_GEMINI_MODEL,
+    DEFAULT_MAX_CONCURRENCY,
+    GeminiTools,
+    _summarize_template,
+)
 
 
 class TestGeminiTools:
@@ -28,6 +34,13 @@ class TestGeminiTools:
         assert len(tools.allowed_directories) == 1
         assert tools.allowed_directories[0] == Path.cwd()
 
+    def test_gemini_path_lookup_is_cached(self, mock_gemini_cli):
+        """Test that PATH is only scanned once across instances."""
+        GeminiTools()
+        GeminiTools()
+
+        mock_gemini_cli.assert_called_once_with("gemini")
+
     def test_initialization_with_custom_directories(self, mock_gemini_cli, tmp_path):
         """Test initialization with custom allowed directories."""
         custom_dir = tmp_path / "custom"
@@ -37,23 +50,31 @@ class TestGeminiTools:
         assert len(tools.allowed_directories) == 1
         assert tools.allowed_directories[0] == custom_dir.resolve()
 
-    def test_get_tool_definitions(self, mock_gemini_cli):
+    def test_get_tool_definitions(self, shared_tools):
         """Test that all tool definitions are properly returned."""
-        tools = GeminiTools()
-        definitions = tools.get_tool_definitions()
+        definitions = shared_tools.get_tool_definitions()
 
-        assert len(definitions) == 4
+        assert len(definitions) == 5
         tool_names = [tool.name for tool in definitions]
         assert "gemini_prompt" in tool_names
         assert "gemini_research" in tool_names
         assert "gemini_analyze_code" in tool_names
         assert "gemini_summarize" in tool_names
+        assert "gemini_batch" in tool_names
 
         # Check that default model is used consistently
         for tool in definitions:
             if "model" in tool.inputSchema["properties"]:
                 assert tool.inputSchema["properties"]["model"]["default"] == DEFAULT_GEMINI_MODEL
 
+    def test_get_tool_definitions_built_once(self, mock_gemini_cli):
+        """Test that tool definitions are shared rather than rebuilt per call."""
+        first = GeminiTools().get_tool_definitions()
+        second = GeminiTools().get_tool_definitions()
+
+        assert first is not second
+        assert all(a is b for a, b in zip(first, second, strict=True))
+
     def test_validate_file_path_valid(self, mock_gemini_cli, temp_directory):
         """Test file path validation with valid paths."""
         tools = GeminiTools(allowed_directories=[str(temp_directory)])
@@ -80,6 +101,61 @@ class TestGeminiTools:
         with pytest.raises(ValueError, match="outside allowed directories"):
             tools._validate_file_path(str(temp_directory / ".." / ".." / "etc" / "passwd"))
 
+    def test_validate_file_path_sibling_prefix(self, mock_gemini_cli, tmp_path):
+        """Test that a sibling directory sharing a name prefix is not allowed."""
+        allowed = tmp_path / "project"
+        allowed.mkdir()
+        sibling = tmp_path / "project-secrets"
+        sibling.mkdir()
+        tools = GeminiTools(allowed_directories=[str(allowed)])
+
+        # The allowed directory itself is valid
+        assert tools._validate_file_path(str(allowed)) == allowed.resolve()
+
+        with pytest.raises(ValueError, match="outside allowed directories"):
+            tools._validate_file_path(str(sibling / "key.pem"))
+
+    def test_validate_file_path_root_directory(self, mock_gemini_cli):
+        """Test that allowing the filesystem root allows any absolute path."""
+        root = Path(Path.cwd().anchor)
+        tools = GeminiTools(allowed_directories=[str(root)])
+
+        result = tools._validate_file_path(str(Path.cwd()))
+        assert result == Path.cwd().resolve()
+
+    def test_validate_existing_file_symlink_swap(self, mock_gemini_cli, tmp_path):
+        """Test that retargeted symlinks are revalidated on every call."""
+        allowed = tmp_path / "allowed"
+        allowed.mkdir()
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "secret.txt").write_text("TOPSECRET")
+        real = allowed / "real.txt"
+        real.write_text("notes")
+        link = allowed / "link.txt"
+        link.symlink_to(real)
+        tools = GeminiTools(allowed_directories=[str(allowed)])
+
+        assert tools._validate_existing_file(str(link)) == str(real.resolve())
+
+        # Rename keeps the inode and mtime, then real.txt is swapped for an
+        # escaping symlink while link.txt is pointed at the renamed file
+        other = allowed / "other.txt"
+        real.rename(other)
+        real.symlink_to(outside / "secret.txt")
+        link.unlink()
+        link.symlink_to(other)
+
+        assert tools._validate_existing_file(str(link)) == str(other.resolve())
+        with pytest.raises(ValueError, match="outside allowed directories"):
+            tools._validate_existing_file(str(real))
+
+        # Replacing the link with one that escapes is rejected too
+        link.unlink()
+        link.symlink_to(outside / "secret.txt")
+        with pytest.raises(ValueError, match="outside allowed directories"):
+            tools._validate_existing_file(str(link))
+
     @pytest.mark.asyncio
     async def test_run_gemini_command_simple(self, mock_gemini_cli, mock_subprocess):
         """Test running a simple Gemini command."""
@@ -90,12 +166,9 @@ class TestGeminiTools:
 
         # Verify subprocess was called correctly
         mock_create.assert_called_once()
-        call_args = mock_create.call_args[0]
-        assert call_args[0] == "/usr/local/bin/gemini"
-        assert "-m" in call_args
-        assert DEFAULT_GEMINI_MODEL in call_args
-        assert "-p" in call_args
-        assert "Test prompt" in call_args
+        gemini_path, *args = mock_create.await_args.args
+        assert gemini_path == "/usr/local/bin/gemini"
+        assert {"-m", DEFAULT_GEMINI_MODEL, "-p", "Test prompt"} <= frozenset(args)
 
         assert result == "Mocked Gemini output"
 
@@ -109,15 +182,7 @@ class TestGeminiTools:
 
         test_file = temp_directory / "test1.txt"
 
-        # Mock aiofiles to avoid actual file I/O in tests
-        with patch("aiofiles.open") as mock_aiofiles:
-            mock_file = AsyncMock()
-            mock_file.__aenter__.return_value = mock_file
-            mock_file.write = AsyncMock()
-            mock_file.read = AsyncMock(return_value=f"{test_file}\n")
-            mock_aiofiles.return_value = mock_file
-
-            await tools._run_gemini_command("Analyze this file", files=[str(test_file)])
+        await tools._run_gemini_command("Analyze this file", files=[str(test_file)])
 
         # Verify the -a flag was added
         call_args = mock_create.call_args[0]
@@ -126,28 +191,300 @@ class TestGeminiTools:
         # Verify stdin was provided with file list
         mock_process.communicate.assert_called_once()
         stdin_data = mock_process.communicate.call_args[1]["input"]
-        assert test_file.name in stdin_data.decode()
+        assert stdin_data.decode() == f"{test_file.resolve()}\n"
 
     @pytest.mark.asyncio
-    async def test_run_gemini_command_error(self, mock_gemini_cli, mock_subprocess):
-        """Test handling of Gemini command errors."""
+    async def test_run_gemini_command_preserves_file_order(
+        self, mock_gemini_cli, mock_subprocess, temp_directory
+    ):
+        """Test that concurrently validated files keep their order in stdin."""
+        mock_create, mock_process = mock_subprocess
+        tools = GeminiTools(allowed_directories=[str(temp_directory)])
+
+        files = [
+            temp_directory / "test2.py",
+            temp_directory / "subdir" / "test3.md",
+            temp_directory / "test1.txt",
+        ]
+        await tools._run_gemini_command("Analyze", files=[str(f) for f in files])
+
+        stdin_data = mock_process.communicate.call_args[1]["input"].decode()
+        assert stdin_data.splitlines() == [str(f.resolve()) for f in files]
+
+    @pytest.mark.asyncio
+    async def test_response_cache_disabled_by_default(self, mock_gemini_cli, mock_subprocess):
+        """Test that identical commands run Gemini each time without GEMINI_MCP_CACHE."""
+        mock_create, mock_process = mock_subprocess
+        tools = GeminiTools()
+
+        await tools._run_gemini_command("Same prompt")
+        await tools._run_gemini_command("Same prompt")
+
+        assert mock_create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_response_cache(self, mock_gemini_cli, mock_subprocess, temp_directory):
+        """Test that identical commands are cached until an attached file changes."""
+        mock_create, mock_process = mock_subprocess
+        with patch.dict(os.environ, {"GEMINI_MCP_CACHE": "1"}):
+            tools = GeminiTools(allowed_directories=[str(temp_directory)])
+
+        test_file = temp_directory / "test1.txt"
+
+        first = await tools._run_gemini_command("Summarize", files=[str(test_file)])
+        second = await tools._run_gemini_command("Summarize", files=[str(test_file)])
+        assert first == second == "Mocked Gemini output"
+        assert mock_create.call_count == 1
+
+        # A different prompt is a different cache entry
+        await tools._run_gemini_command("Explain", files=[str(test_file)])
+        assert mock_create.call_count == 2
+
+        # Editing the file invalidates its cached responses
+        stat = test_file.stat()
+        os.utime(test_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        await tools._run_gemini_command("Summarize", files=[str(test_file)])
+        assert mock_create.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_response_cache_coalesces_concurrent_calls(self, mock_gemini_cli):
+        """Test that concurrent identical commands share a single Gemini run."""
+        calls = 0
+
+        class SlowProcess:
+            returncode = 0
+
+            async def communicate(self, input=None):
+                nonlocal calls
+                calls += 1
+                await asyncio.sleep(0.01)
+                return b"Shared answer", b""
+
+        with patch.dict(os.environ, {"GEMINI_MCP_CACHE_TTL": "60"}):
+            tools = GeminiTools()
+
+        with patch("asyncio.create_subprocess_exec", side_effect=lambda *a, **k: SlowProcess()):
+            results = await asyncio.gather(
+                *(tools._run_gemini_command("Same prompt") for _ in range(3))
+            )
+            await tools._run_gemini_command("Other prompt")
+
+        assert calls == 2
+        assert results == ["Shared answer"] * 3
+        # Locks are released once no call is using them
+        assert not tools._cache_locks
+
+    @pytest.mark.asyncio
+    async def test_response_cache_ttl_expires(self, mock_gemini_cli, mock_subprocess):
+        """Test that cached responses are dropped once GEMINI_MCP_CACHE_TTL has passed."""
+        mock_create, mock_process = mock_subprocess
+        with patch.dict(os.environ, {"GEMINI_MCP_CACHE_TTL": "60"}):
+            tools = GeminiTools()
+
+        with patch("gemini_mcp.tools.time") as mock_time:
+            mock_time.monotonic.side_effect = [0.0, 30.0, 90.0, 90.0]
+            for _ in range(3):
+                await tools._run_gemini_command("Same prompt")
+
+        # Stored at 0, hit at 30, expired at 90
+        assert mock_create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_response_cache_bounded(self, mock_gemini_cli, mock_subprocess):
+        """Test that the response cache evicts its oldest entries beyond its size limit."""
         mock_create, mock_process = mock_subprocess
-        mock_process.returncode = 1
-        mock_process.communicate.return_value = (b"", b"Error: Invalid prompt")
+        with patch.dict(os.environ, {"GEMINI_MCP_CACHE": "1"}):
+            tools = GeminiTools()
+
+        with patch("gemini_mcp.tools.RESPONSE_CACHE_SIZE", 2):
+            for prompt in ("one", "two", "three", "one"):
+                await tools._run_gemini_command(prompt)
+
+        assert mock_create.call_count == 4
+        assert len(tools._response_cache) == 2
+
+    @pytest.mark.asyncio
+    async def test_response_cache_skips_disallowed_files(
+        self, mock_gemini_cli, mock_subprocess, temp_directory
+    ):
+        """Test that files outside the allowed directories are rejected before any cache lookup."""
+        with patch.dict(os.environ, {"GEMINI_MCP_CACHE": "1"}):
+            tools = GeminiTools(allowed_directories=[str(temp_directory / "subdir")])
+
+        with (
+            patch("gemini_mcp.tools._file_stamps") as mock_stamps,
+            pytest.raises(ValueError, match="outside allowed directories"),
+        ):
+            await tools._run_gemini_command("Summarize", files=[str(temp_directory / "test1.txt")])
+
+        mock_stamps.assert_not_called()
+
+    @pytest.mark.parametrize("value", ["soon", "nan", "inf"])
+    def test_invalid_cache_ttl_disables_cache(self, mock_gemini_cli, value):
+        """Test that an unparsable GEMINI_MCP_CACHE_TTL disables the cache instead of crashing."""
+        with patch.dict(os.environ, {"GEMINI_MCP_CACHE_TTL": value}):
+            tools = GeminiTools()
 
+        assert tools._response_cache is None
+
+    @pytest.mark.asyncio
+    async def test_run_gemini_command_error(self, mock_gemini_cli, make_fake_process):
+        """Test handling of Gemini command errors."""
+        process = make_fake_process(returncode=1, stdout=b"", stderr=b"Error: Invalid prompt")
         tools = GeminiTools()
 
-        with pytest.raises(RuntimeError, match="Gemini CLI error: Error: Invalid prompt"):
+        with (
+            patch("asyncio.create_subprocess_exec", return_value=process),
+            pytest.raises(RuntimeError, match="Gemini CLI error: Error: Invalid prompt"),
+        ):
             await tools._run_gemini_command("Bad prompt")
 
+    @pytest.mark.asyncio
+    async def test_run_gemini_command_concurrency_limit(self, mock_gemini_cli):
+        """Test that concurrent Gemini processes are capped by GEMINI_MCP_MAX_CONCURRENCY."""
+        with patch.dict(os.environ, {"GEMINI_MCP_MAX_CONCURRENCY": "2"}):
+            tools = GeminiTools()
+
+        active = 0
+        peak = 0
+
+        async def slow_communicate(input=None):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return (b"ok", b"")
+
+        process = Mock()
+        process.returncode = 0
+        process.communicate = slow_communicate
+
+        with patch("asyncio.create_subprocess_exec", return_value=process):
+            results = await asyncio.gather(
+                *(tools.call_tool("gemini_prompt", {"prompt": f"Question {i}"}) for i in range(5))
+            )
+
+        assert results == ["ok"] * 5
+        assert peak == 2
+
+    @pytest.mark.parametrize("value", ["0", "-2", "many"])
+    def test_invalid_max_concurrency(self, mock_gemini_cli, value, caplog):
+        """Test that a GEMINI_MCP_MAX_CONCURRENCY that isn't a positive integer is ignored."""
+        with patch.dict(os.environ, {"GEMINI_MCP_MAX_CONCURRENCY": value}):
+            tools = GeminiTools()
+
+        assert tools._semaphore._value == DEFAULT_MAX_CONCURRENCY
+        assert "Ignoring invalid GEMINI_MCP_MAX_CONCURRENCY" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_run_gemini_command_streams_output(self, mock_gemini_cli, make_streaming_process):
+        """Test that output is forwarded in chunks when a callback is given."""
+        output = "line one\nlíne twö\n".encode()
+        process = make_streaming_process(stdout=output)
+
+        received = []
+
+        async def on_output(chunk):
+            received.append(chunk)
+
+        tools = GeminiTools()
+        # Use tiny chunks so multi-byte characters are split across reads
+        with (
+            patch("asyncio.create_subprocess_exec", return_value=process),
+            patch("gemini_mcp.tools.STREAM_CHUNK_SIZE", 4),
+        ):
+            result = await tools.call_tool(
+                "gemini_prompt", {"prompt": "Stream this"}, on_output=on_output
+            )
+
+        assert len(received) > 1
+        assert "".join(received) == output.decode()
+        assert result == "line one\nlíne twö"
+        process.stdin.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_streaming_reports_error_when_stdin_closed_early(
+        self, mock_gemini_cli, make_streaming_process
+    ):
+        """Test that a CLI exiting before reading stdin surfaces its stderr message."""
+        process = make_streaming_process(stderr=b"Error: not authenticated", returncode=1)
+        process.stdin.drain.side_effect = BrokenPipeError
+
+        async def on_output(chunk):
+            pass
+
+        tools = GeminiTools()
+        with (
+            patch("asyncio.create_subprocess_exec", return_value=process),
+            pytest.raises(RuntimeError, match="authentication error"),
+        ):
+            await tools._run_gemini_command("Prompt", stdin_input="x" * 100, on_output=on_output)
+
+        process.stdin.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_streaming_kills_process_when_callback_fails(
+        self, mock_gemini_cli, make_streaming_process
+    ):
+        """Test that the CLI is killed and reaped if forwarding output fails."""
+        process = make_streaming_process(stdout=b"partial output")
+        process.returncode = None
+
+        async def on_output(chunk):
+            raise ConnectionResetError("client went away")
+
+        tools = GeminiTools()
+        with (
+            patch("asyncio.create_subprocess_exec", return_value=process),
+            pytest.raises(ConnectionResetError),
+        ):
+            await tools._run_gemini_command("Prompt", on_output=on_output)
+
+        process.kill.assert_called_once()
+        process.wait.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_kills_process_before_releasing_slot(self, mock_gemini_cli):
+        """Test that a cancelled call reaps its CLI while still holding its concurrency slot."""
+        started = asyncio.Event()
+        slot_held_on_wait = []
+
+        process = Mock()
+        process.returncode = None
+
+        async def communicate(input=None):
+            started.set()
+            await asyncio.sleep(10)
+
+        async def wait():
+            slot_held_on_wait.append(tools._semaphore.locked())
+
+        process.communicate = communicate
+        process.wait = wait
+
+        with patch.dict(os.environ, {"GEMINI_MCP_MAX_CONCURRENCY": "1"}):
+            tools = GeminiTools()
+
+        with patch("asyncio.create_subprocess_exec", return_value=process):
+            task = asyncio.create_task(tools._run_gemini_command("Prompt"))
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        process.kill.assert_called_once()
+        assert slot_held_on_wait == [True]
+        assert not tools._semaphore.locked()
+
     @pytest.mark.asyncio
     async def test_gemini_prompt(self, mock_gemini_cli, mock_subprocess):
         """Test the gemini_prompt tool."""
         mock_create, mock_process = mock_subprocess
         tools = GeminiTools()
 
-        await tools._gemini_prompt(
-            {"prompt": "What is Python?", "context": "Programming languages"}
+        await tools.call_tool(
+            "gemini_prompt", {"prompt": "What is Python?", "context": "Programming languages"}
         )
 
         # Verify the prompt was properly formatted
@@ -165,46 +502,50 @@ class TestGeminiTools:
         result = await tools._gemini_summarize({})
         assert "Error: Either content or files must be provided" in result
 
-    @pytest.mark.asyncio
-    async def test_call_tool_unknown(self, mock_gemini_cli):
-        """Test calling an unknown tool raises ValueError."""
-        tools = GeminiTools()
+    def test_summarize_template_prefers_content(self):
+        """Test that inline content is summarized instead of any attached files."""
+        prompt, files = _summarize_template(
+            {"content": "Some text", "files": ["notes.txt"], "summary_type": "bullet_points"}
+        )
 
-        with pytest.raises(ValueError, match="Unknown tool: unknown_tool"):
-            await tools.call_tool("unknown_tool", {})
+        assert prompt.startswith("Please summarize the following content as bullet points.")
+        assert prompt.endswith("Content:\nSome text")
+        assert files == []
 
     @pytest.mark.asyncio
-    async def test_temp_file_cleanup(self, mock_gemini_cli, mock_subprocess, temp_directory):
-        """Test that temporary files are cleaned up even on error."""
+    async def test_gemini_batch(self, mock_gemini_cli, mock_subprocess):
+        """Test that batched prompts share one command and responses are split."""
         mock_create, mock_process = mock_subprocess
-        tools = GeminiTools(allowed_directories=[str(temp_directory)])
+        mock_process.communicate.return_value = (
+            f"Answer one\n{BATCH_SEPARATOR}\nAnswer two".encode(),
+            b"",
+        )
+        tools = GeminiTools()
 
-        test_file = temp_directory / "test1.txt"
+        result = await tools.call_tool("gemini_batch", {"prompts": ["First?", "Second?"]})
 
-        # Track temp files created
-        temp_files_created = []
-        original_mkstemp = tempfile.mkstemp
+        mock_create.assert_called_once()
+        call_args = mock_create.call_args[0]
+        prompt = call_args[call_args.index("-p") + 1]
+        assert "First?" in prompt
+        assert "Second?" in prompt
+        assert BATCH_SEPARATOR in prompt
 
-        def track_mkstemp(*args, **kwargs):
-            fd, path = original_mkstemp(*args, **kwargs)
-            temp_files_created.append(path)
-            return fd, path
+        assert result == "Response 1:\nAnswer one\n\nResponse 2:\nAnswer two"
 
-        with (
-            patch("tempfile.mkstemp", side_effect=track_mkstemp),
-            patch("aiofiles.open") as mock_aiofiles,
-        ):
-            mock_file = AsyncMock()
-            mock_file.__aenter__.return_value = mock_file
-            mock_file.write = AsyncMock()
-            mock_aiofiles.return_value = mock_file
+    @pytest.mark.asyncio
+    async def test_gemini_batch_mismatched_responses(self, mock_gemini_cli, mock_subprocess):
+        """Test that the raw output is returned if responses can't be split per prompt."""
+        tools = GeminiTools()
 
-            # Force an error during command execution
-            mock_process.communicate.side_effect = Exception("Command failed")
+        result = await tools.call_tool("gemini_batch", {"prompts": ["First?", "Second?"]})
 
-            with pytest.raises(Exception, match="Command failed"):
-                await tools._run_gemini_command("Test", files=[str(test_file)])
+        assert result == "Mocked Gemini output"
+
+    @pytest.mark.asyncio
+    async def test_call_tool_unknown(self, mock_gemini_cli):
+        """Test calling an unknown tool raises ValueError."""
+        tools = GeminiTools()
 
-        # Verify temp files were cleaned up
-        for temp_file in temp_files_created:
-            assert not os.path.exists(temp_file)
+        with pytest.raises(ValueError, match="Unknown tool: unknown_tool"):
+            await tools.call_tool("unknown_tool", {})